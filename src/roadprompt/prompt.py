@@ -4,14 +4,34 @@ Collect user input with validation and auto-completion.
 """
 
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from functools import lru_cache, partial
+from itertools import islice
+from typing import Any, Callable, ClassVar, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import getpass
+import heapq
+import re
 import sys
 import logging
 
 logger = logging.getLogger(__name__)
 
+_FAIL_PREFIX = "  ✗ "
+_FAIL_SUFFIX = "\n"
 
-@dataclass
+_TRUTHY = frozenset({"y", "yes", "true", "1"})
+
+_PATTERN_CACHE: Dict[Tuple[str, int], "re.Pattern[str]"] = {}
+
+
+def _compile(regex: str, flags: int = 0) -> "re.Pattern[str]":
+    key = (regex, flags)
+    compiled = _PATTERN_CACHE.get(key)
+    if compiled is None:
+        compiled = _PATTERN_CACHE.setdefault(key, re.compile(regex, flags))
+    return compiled
+
+
+@dataclass(slots=True, frozen=True)
 class Choice:
     value: Any
     label: str
@@ -19,210 +39,328 @@ class Choice:
     hint: str = ""
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ValidationResult:
     valid: bool
     message: str = ""
 
+    OK: ClassVar["ValidationResult"]
+
+
+ValidationResult.OK = ValidationResult(True)
+
+
+def _first_failure(validators: Iterable[Callable], value: str) -> Optional[ValidationResult]:
+    ok = ValidationResult.OK
+    return next((r for v in validators if (r := v(value)) is not ok and not r.valid), None)
+
+
+def _regex_validator(compiled: "re.Pattern[str]", message: str) -> Callable:
+    # Bound match and both results ride in defaults so each call is LOAD_FAST only.
+    def validate(value: str, _match=compiled.match, _ok=ValidationResult.OK,
+                 _fail=ValidationResult(False, message)) -> ValidationResult:
+        return _ok if _match(value) else _fail
+    return validate
+
 
 class Validator:
+    _EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
     @staticmethod
     def required(value: str) -> ValidationResult:
         if not value or not value.strip():
             return ValidationResult(False, "This field is required")
-        return ValidationResult(True)
+        return ValidationResult.OK
 
     @staticmethod
+    @lru_cache(maxsize=128, typed=True)
     def min_length(length: int) -> Callable:
         def validate(value: str) -> ValidationResult:
             if len(value) < length:
                 return ValidationResult(False, f"Minimum length is {length}")
-            return ValidationResult(True)
+            return ValidationResult.OK
         return validate
 
     @staticmethod
+    @lru_cache(maxsize=128, typed=True)
     def max_length(length: int) -> Callable:
         def validate(value: str) -> ValidationResult:
             if len(value) > length:
                 return ValidationResult(False, f"Maximum length is {length}")
-            return ValidationResult(True)
+            return ValidationResult.OK
         return validate
 
     @staticmethod
+    @lru_cache(maxsize=128, typed=True)
     def pattern(regex: str, message: str = "Invalid format") -> Callable:
-        import re
-        compiled = re.compile(regex)
-        def validate(value: str) -> ValidationResult:
-            if not compiled.match(value):
-                return ValidationResult(False, message)
-            return ValidationResult(True)
-        return validate
+        return _regex_validator(_compile(regex), message)
 
     @staticmethod
+    @lru_cache(maxsize=1)
     def email() -> Callable:
-        return Validator.pattern(
-            r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$',
-            "Invalid email address"
-        )
+        return _regex_validator(Validator._EMAIL_RE, "Invalid email address")
 
     @staticmethod
+    @lru_cache(maxsize=128, typed=True)
     def number(min_val: float = None, max_val: float = None) -> Callable:
-        def validate(value: str) -> ValidationResult:
-            try:
-                num = float(value)
-                if min_val is not None and num < min_val:
-                    return ValidationResult(False, f"Minimum value is {min_val}")
-                if max_val is not None and num > max_val:
-                    return ValidationResult(False, f"Maximum value is {max_val}")
-                return ValidationResult(True)
-            except ValueError:
-                return ValidationResult(False, "Must be a number")
+        # Pick a closure specialised to the bounds given, so unused checks never run.
+        ok = ValidationResult.OK
+        nan = ValidationResult(False, "Must be a number")
+        low = ValidationResult(False, f"Minimum value is {min_val}")
+        high = ValidationResult(False, f"Maximum value is {max_val}")
+        if min_val is None and max_val is None:
+            def validate(value: str, _float=float, _ok=ok, _nan=nan) -> ValidationResult:
+                try:
+                    _float(value)
+                except ValueError:
+                    return _nan
+                return _ok
+        elif max_val is None:
+            def validate(value: str, _float=float, _ok=ok, _nan=nan,
+                         _lo=min_val, _low=low) -> ValidationResult:
+                try:
+                    num = _float(value)
+                except ValueError:
+                    return _nan
+                return _low if num < _lo else _ok
+        elif min_val is None:
+            def validate(value: str, _float=float, _ok=ok, _nan=nan,
+                         _hi=max_val, _high=high) -> ValidationResult:
+                try:
+                    num = _float(value)
+                except ValueError:
+                    return _nan
+                return _high if num > _hi else _ok
+        else:
+            def validate(value: str, _float=float, _ok=ok, _nan=nan,
+                         _lo=min_val, _low=low, _hi=max_val, _high=high) -> ValidationResult:
+                try:
+                    num = _float(value)
+                except ValueError:
+                    return _nan
+                if num < _lo:
+                    return _low
+                return _high if num > _hi else _ok
         return validate
 
 
+class _TrieNode:
+    __slots__ = ("children", "words", "first")
+
+    def __init__(self, first: int):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.words: List[Tuple[int, str]] = []
+        self.first = first
+
+
+class Trie:
+    """Prefix tree over suggestions; completions come back in insertion order."""
+
+    def __init__(self, words: Iterable[str] = ()):
+        self._root = _TrieNode(0)
+        self._size = 0
+        for word in words:
+            self.insert(word)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def insert(self, word: str) -> None:
+        index = self._size
+        self._size += 1
+        node = self._root
+        for char in word:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _TrieNode(index)
+            node = child
+        node.words.append((index, word))
+
+    def descend(self, prefix: str) -> Optional[_TrieNode]:
+        node = self._root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def complete(self, prefix: str) -> Iterator[str]:
+        node = self.descend(prefix)
+        if node is None:
+            return
+        # Best-first walk keyed on insertion index, so callers can stop early
+        # without the subtree ever being fully enumerated.
+        heap: List[Tuple[int, int, Any]] = [(node.first, 1, node)]
+        while heap:
+            _, kind, item = heapq.heappop(heap)
+            if kind == 0:
+                yield item
+                continue
+            for index, word in item.words:
+                heapq.heappush(heap, (index, 0, word))
+            for child in item.children.values():
+                heapq.heappush(heap, (child.first, 1, child))
+
+
 class Prompt:
+    """Line-oriented prompts; stream_in must be a buffered text stream such as sys.stdin."""
+
+    _CSV_INTS = re.compile(r'\s*[+-]?\d+(?:\s*,\s*[+-]?\d+)*\s*')
+    _CSV_SPLIT = re.compile(r'\s*,\s*')
+
     def __init__(self, stream_in=None, stream_out=None):
         self.stream_in = stream_in or sys.stdin
         self.stream_out = stream_out or sys.stdout
 
-    def _write(self, text: str) -> None:
-        self.stream_out.write(text)
+    def _write(self, *parts: str) -> None:
+        self.stream_out.write("".join(parts))
+
+    def _writelines(self, lines: Iterable[str]) -> None:
+        self.stream_out.writelines(lines)
+
+    def _ask(self, prompt: str, read: Callable[[], str] = None) -> str:
+        # The only flush point: everything written since the last prompt goes out here.
+        self.stream_out.write(prompt)
         self.stream_out.flush()
+        return (read or self._read)()
 
     def _read(self) -> str:
-        return self.stream_in.readline().rstrip("\n")
+        return self.stream_in.readline().rstrip("\r\n")
 
     def text(self, message: str, default: str = "", validators: List[Callable] = None, password: bool = False) -> str:
-        validators = validators or []
+        validators = tuple(validators or ())
+        prompt = f"{message} [{default}]: " if default else f"{message}: "
+        
+        write = self._write
+        ask = self._ask
+        read = partial(getpass.getpass, "") if password else self._read
         
         while True:
-            prompt = f"{message}"
-            if default:
-                prompt += f" [{default}]"
-            prompt += ": "
-            
-            self._write(prompt)
-            
-            if password:
-                import getpass
-                value = getpass.getpass("")
-            else:
-                value = self._read()
+            value = ask(prompt, read)
             
             if not value and default:
                 value = default
             
-            valid = True
-            for validator in validators:
-                result = validator(value)
-                if not result.valid:
-                    self._write(f"  ✗ {result.message}\n")
-                    valid = False
-                    break
-            
-            if valid:
+            failure = _first_failure(validators, value)
+            if failure is None:
                 return value
+            write(_FAIL_PREFIX, failure.message, _FAIL_SUFFIX)
 
     def confirm(self, message: str, default: bool = False) -> bool:
         hint = "[Y/n]" if default else "[y/N]"
-        self._write(f"{message} {hint}: ")
-        
-        value = self._read().lower()
+        value = self._ask(f"{message} {hint}: ").casefold()
         
         if not value:
             return default
         
-        return value in ("y", "yes", "true", "1")
+        return value in _TRUTHY
 
     def select(self, message: str, choices: List[Choice], default: int = 0) -> Any:
-        self._write(f"{message}\n")
-        
-        for i, choice in enumerate(choices):
-            marker = ">" if i == default else " "
-            disabled = " (disabled)" if choice.disabled else ""
-            hint = f" - {choice.hint}" if choice.hint else ""
-            self._write(f"  {marker} {i + 1}. {choice.label}{disabled}{hint}\n")
+        def lines() -> Iterator[str]:
+            yield f"{message}\n"
+            for i, choice in enumerate(choices):
+                marker = ">" if i == default else " "
+                disabled = " (disabled)" if choice.disabled else ""
+                hint = f" - {choice.hint}" if choice.hint else ""
+                yield f"  {marker} {i + 1}. {choice.label}{disabled}{hint}\n"
+        self._writelines(lines())
+        values = [choice.value for choice in choices]
+        disabled = [choice.disabled for choice in choices]
+        n = len(choices)
+        prompt = f"Enter choice [1-{n}]: "
+        disabled_msg = f"{_FAIL_PREFIX}This option is disabled{_FAIL_SUFFIX}"
+        invalid = f"{_FAIL_PREFIX}Invalid selection{_FAIL_SUFFIX}"
+        write = self._write
+        ask = self._ask
         
         while True:
-            self._write(f"Enter choice [1-{len(choices)}]: ")
-            value = self._read()
+            value = ask(prompt)
             
             if not value:
-                return choices[default].value
+                return values[default]
             
             try:
                 idx = int(value) - 1
-                if 0 <= idx < len(choices):
-                    if choices[idx].disabled:
-                        self._write("  ✗ This option is disabled\n")
+                if 0 <= idx < n:
+                    if disabled[idx]:
+                        write(disabled_msg)
                         continue
-                    return choices[idx].value
+                    return values[idx]
             except ValueError:
                 pass
             
-            self._write("  ✗ Invalid selection\n")
+            write(invalid)
 
     def multi_select(self, message: str, choices: List[Choice], min_select: int = 0, max_select: int = None) -> List[Any]:
-        self._write(f"{message} (comma-separated numbers)\n")
-        
-        for i, choice in enumerate(choices):
-            disabled = " (disabled)" if choice.disabled else ""
-            self._write(f"  {i + 1}. {choice.label}{disabled}\n")
+        def lines() -> Iterator[str]:
+            yield f"{message} (comma-separated numbers)\n"
+            for i, choice in enumerate(choices):
+                disabled = " (disabled)" if choice.disabled else ""
+                yield f"  {i + 1}. {choice.label}{disabled}\n"
+        self._writelines(lines())
+        values = [choice.value for choice in choices]
+        enabled = [not choice.disabled for choice in choices]
+        n = len(choices)
+        fullmatch = self._CSV_INTS.fullmatch
+        split = self._CSV_SPLIT.split
+        invalid = f"{_FAIL_PREFIX}Invalid input{_FAIL_SUFFIX}"
+        too_few = f"{_FAIL_PREFIX}Select at least {min_select} options{_FAIL_SUFFIX}"
+        too_many = f"{_FAIL_PREFIX}Select at most {max_select} options{_FAIL_SUFFIX}"
+        write = self._write
+        ask = self._ask
         
         while True:
-            self._write("Enter choices: ")
-            value = self._read()
+            value = ask("Enter choices: ")
             
             if not value:
                 if min_select == 0:
                     return []
-                self._write(f"  ✗ Select at least {min_select} options\n")
+                write(too_few)
                 continue
             
-            try:
-                indices = [int(x.strip()) - 1 for x in value.split(",")]
-                selected = []
-                
-                for idx in indices:
-                    if 0 <= idx < len(choices) and not choices[idx].disabled:
-                        selected.append(choices[idx].value)
-                
-                if len(selected) < min_select:
-                    self._write(f"  ✗ Select at least {min_select} options\n")
-                    continue
-                
-                if max_select and len(selected) > max_select:
-                    self._write(f"  ✗ Select at most {max_select} options\n")
-                    continue
-                
-                return selected
-            except ValueError:
-                self._write("  ✗ Invalid input\n")
+            if not fullmatch(value):
+                write(invalid)
+                continue
+            
+            indices = [int(x) - 1 for x in split(value.strip())]
+            selected = [values[idx] for idx in indices if 0 <= idx < n and enabled[idx]]
+            
+            if len(selected) < min_select:
+                write(too_few)
+                continue
+            
+            if max_select and len(selected) > max_select:
+                write(too_many)
+                continue
+            
+            return selected
 
-    def autocomplete(self, message: str, suggestions: List[str], validators: List[Callable] = None) -> str:
-        validators = validators or []
+    def autocomplete(self, message: str, suggestions: Union[List[str], Trie], validators: List[Callable] = None) -> str:
+        validators = tuple(validators or ())
+        # Building a trie costs far more than a scan, so only use one the caller prebuilt.
+        if isinstance(suggestions, Trie):
+            complete = suggestions.complete
+        else:
+            def complete(prefix: str) -> Iterator[str]:
+                return (s for s in suggestions if s.startswith(prefix))
+        prompt = f"{message} (tab for suggestions): "
+        write = self._write
+        ask = self._ask
         
         while True:
-            self._write(f"{message} (tab for suggestions): ")
-            value = self._read()
+            value = ask(prompt)
             
-            if value.endswith("\t"):
+            if value and value[-1] == "\t":
                 prefix = value.rstrip("\t")
-                matches = [s for s in suggestions if s.startswith(prefix)]
+                matches = list(islice(complete(prefix), 5))
                 if matches:
-                    self._write(f"  Suggestions: {', '.join(matches[:5])}\n")
+                    write(f"  Suggestions: {', '.join(matches)}\n")
                 continue
             
-            valid = True
-            for validator in validators:
-                result = validator(value)
-                if not result.valid:
-                    self._write(f"  ✗ {result.message}\n")
-                    valid = False
-                    break
-            
-            if valid:
+            failure = _first_failure(validators, value)
+            if failure is None:
                 return value
+            write(_FAIL_PREFIX, failure.message, _FAIL_SUFFIX)
 
 
 class Wizard:
@@ -237,21 +375,23 @@ class Wizard:
         return self
 
     def run(self) -> Dict[str, Any]:
-        print(f"\n{'=' * 40}")
-        print(f"  {self.title}")
-        print(f"{'=' * 40}\n")
+        steps = tuple(self.steps)
+        results = self.results
+        prompt = self.prompt
+        write = prompt._write
+        bar = "=" * 40
+        total = len(steps)
+        write(f"\n{bar}\n  {self.title}\n{bar}\n\n")
         
-        for i, (name, fn) in enumerate(self.steps):
-            print(f"Step {i + 1}/{len(self.steps)}: {name}")
-            result = fn(self.prompt, self.results)
-            self.results[name] = result
-            print()
+        for i, (name, fn) in enumerate(steps):
+            write(f"Step {i + 1}/{total}: {name}\n")
+            results[name] = fn(prompt, results)
+            write("\n")
         
-        print(f"{'=' * 40}")
-        print("  Setup complete!")
-        print(f"{'=' * 40}\n")
+        write(f"{bar}\n  Setup complete!\n{bar}\n\n")
+        prompt.stream_out.flush()
         
-        return self.results
+        return results
 
 
 def example_usage():